@@ -1,7 +1,22 @@
 import pygame
 import sys
+import os
 import random
 import time
+import json
+import hashlib
+import argparse
+import multiprocessing
+from array import array
+from collections import deque
+
+# 无界面的子命令使用虚拟显示，不弹出窗口
+HEADLESS_COMMANDS = ('fuzz', 'analytics')
+# 子命令前面可能还有 --no-log 等全局选项
+if any(arg in HEADLESS_COMMANDS for arg in sys.argv[1:]):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    # SDL 默认拦截 SIGTERM，会让进程池无法结束工作进程
+    os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
 
 # 初始化pygame
 pygame.init()
@@ -13,6 +28,9 @@ GRID_SIZE = 20
 GRID_WIDTH = GAME_WIDTH // GRID_SIZE
 GRID_HEIGHT = GAME_HEIGHT // GRID_SIZE
 BASE_FPS = 10  # 基础速度
+BASE_SPEEDS = [0.5 * BASE_FPS, 0.75 * BASE_FPS, BASE_FPS, 1.5 * BASE_FPS, 2 * BASE_FPS]  # 各速度档位每秒移动的格数
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')  # 预计算数据缓存目录
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')  # 对局事件日志目录
 
 # 颜色定义
 BLACK = (0, 0, 0)
@@ -31,12 +49,36 @@ PANEL_BG = (40, 40, 80)
 BUTTON_COLOR = (70, 130, 180)
 BUTTON_HOVER = (100, 180, 255)
 GOLD = (255, 215, 0)
+WALL_COLOR = (110, 110, 140)
+WALL_BORDER = (70, 70, 100)
 
 # 方向常量
 UP = (0, -1)
 DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
+# 回放文件中的动作编号：0 表示不操作，1-4 为方向，5-8 对应 Q、E、长按方向键加速和松开方向键
+ACTIONS = [None, UP, DOWN, LEFT, RIGHT, 'faster', 'slower', 'boost', 'release']
+
+# 观战视图图集中各种格子的序号
+CELL_EMPTY, CELL_BODY, CELL_HEAD, CELL_FOOD, CELL_GOLDEN = range(5)
+
+# 日志分析参数
+WAIT_BINS = 300  # 吃到食物所用步数的直方图桶数，最后一桶收纳更久的
+SCORE_BINS = 200  # 最终得分直方图，每桶 10 分
+CURVE_STEP = 50  # 得分曲线的采样间隔(步)
+CURVE_POINTS = 200  # 得分曲线的采样点数
+
+# 模糊测试参数
+FUZZ_TICK = 1.0 / 64  # 每帧推进的虚拟时间(秒)，接近真实帧率，二进制可精确表示，保证两边计时完全一致
+
+# 画质档位：档位越高关闭的特效越多，从最不显眼的特效开始关
+QUALITY_NO_TEXT_BG = 1  # 关闭鼓励语的半透明背景
+QUALITY_NO_FOOD_DETAIL = 2  # 关闭苹果的茎叶和金苹果闪光
+QUALITY_NO_GRID = 3  # 关闭网格线
+QUALITY_NO_SNAKE_DETAIL = 4  # 关闭蛇身描边和眼睛
+QUALITY_NAMES = ["高", "较高", "中", "低", "最低"]
+FRAME_BUDGET = 1.0 / 60  # 每帧可用的时间(秒)
 
 # 鼓励话语
 ENCOURAGEMENTS = [
@@ -75,14 +117,141 @@ class Button:
                 return self.action
         return None
 
+class Level:
+    """关卡地图：墙体编译成按位压缩的碰撞位图，并预先计算 BFS 距离场
+
+    地图文件是文本，'#' 为墙，'S' 为蛇的出生点，其余字符为空地，缺少的行和列按空地处理。
+    位图四周多留一圈墙，越界检查和撞墙检查合并成一次 O(1) 查表。
+    距离场记录从出生点走到每个格子的步数，走不到的格子（墙或封闭区域）为 -1。
+    """
+    def __init__(self, rows=(), width=GRID_WIDTH, height=GRID_HEIGHT, name="空地图"):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.bits = bytearray((self.stride * (height + 2) + 7) // 8)
+
+        if len(rows) > height:
+            raise ValueError(f"地图 {name} 超过 {height} 行")
+        start = None
+        self.wall_count = 0
+        for y, row in enumerate(rows):
+            if len(row) > width:
+                raise ValueError(f"地图 {name} 第 {y + 1} 行超过 {width} 列")
+            for x, char in enumerate(row):
+                if char == '#':
+                    self.set_wall(x, y)
+                    self.wall_count += 1
+                elif char == 'S':
+                    start = (x, y)
+
+        # 四周的一圈墙
+        for x in range(-1, width + 1):
+            self.set_wall(x, -1)
+            self.set_wall(x, height)
+        for y in range(height):
+            self.set_wall(-1, y)
+            self.set_wall(width, y)
+
+        self.start = start or (width // 2, height // 2)
+        if self.is_blocked(*self.start):
+            raise ValueError(f"地图 {name} 的出生点在墙上")
+        self.distances = self.bfs(self.start)
+        self.open_cells = sum(1 for d in self.distances if d >= 0)  # 蛇能到达的格子数
+
+    def set_wall(self, x, y):
+        i = (y + 1) * self.stride + x + 1
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def is_blocked(self, x, y):
+        """格子是墙或在棋盘外，坐标最多越界一格"""
+        i = (y + 1) * self.stride + x + 1
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+    def is_open(self, position):
+        """格子不是墙且能从出生点走到，食物只能放在这样的格子上"""
+        return self.distances[position[1] * self.width + position[0]] >= 0
+
+    def start_directions(self):
+        """出生点下一格不是墙的方向，出生时只从中随机选，否则贴墙出生时第一步就可能撞死"""
+        x, y = self.start
+        directions = [d for d in (UP, DOWN, LEFT, RIGHT) if not self.is_blocked(x + d[0], y + d[1])]
+        return directions or [UP, DOWN, LEFT, RIGHT]
+
+    def distance(self, position):
+        """从出生点走到该格子的步数，走不到为 -1"""
+        return self.distances[position[1] * self.width + position[0]]
+
+    def bfs(self, source):
+        """从 source 出发做广度优先搜索，返回到每个格子的步数"""
+        distances = array('i', [-1]) * (self.width * self.height)
+        distances[source[1] * self.width + source[0]] = 0
+        queue = deque([source])
+        while queue:
+            x, y = queue.popleft()
+            step = distances[y * self.width + x] + 1
+            for dx, dy in (UP, DOWN, LEFT, RIGHT):
+                nx, ny = x + dx, y + dy
+                if self.is_blocked(nx, ny) or distances[ny * self.width + nx] >= 0:
+                    continue
+                distances[ny * self.width + nx] = step
+                queue.append((nx, ny))
+        return distances
+
+    @classmethod
+    def load(cls, path):
+        """加载地图文件，编译结果按内容哈希缓存在地图文件旁边"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data + f'{GRID_WIDTH}x{GRID_HEIGHT}'.encode()).hexdigest()[:16]
+        cache_path = f'{path}.{digest}.cache'
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        try:
+            return cls.read_cache(cache_path, name)
+        except (OSError, EOFError):
+            pass
+
+        level = cls(data.decode('utf-8').splitlines(), name=name)
+        try:
+            # 先写临时文件再替换，避免留下写了一半的缓存
+            with open(cache_path + '.tmp', 'wb') as f:
+                array('i', [level.width, level.height, level.start[0], level.start[1],
+                            level.wall_count, level.open_cells]).tofile(f)
+                f.write(level.bits)
+                level.distances.tofile(f)
+            os.replace(cache_path + '.tmp', cache_path)
+        except OSError:
+            pass
+        return level
+
+    @classmethod
+    def read_cache(cls, path, name):
+        level = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            header = array('i')
+            header.fromfile(f, 6)
+            level.width, level.height, start_x, start_y, level.wall_count, level.open_cells = header
+            level.name = name
+            level.stride = level.width + 2
+            level.start = (start_x, start_y)
+            size = (level.stride * (level.height + 2) + 7) // 8
+            level.bits = bytearray(f.read(size))
+            if len(level.bits) != size:
+                raise EOFError
+            level.distances = array('i')
+            level.distances.fromfile(f, level.width * level.height)
+        return level
+
 class Snake:
-    def __init__(self):
+    def __init__(self, level=None):
+        self.level = level or Level()  # 当前地图，决定出生点和撞墙判定
         self.reset()
-        
+
     def reset(self):
         self.length = 3
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
+        self.positions = [self.level.start]
+        self.direction = random.choice(self.level.start_directions())
         self.score = 0
         self.speed_level = 2  # 初始速度级别 (1x)
         self.grow_to = 3
@@ -90,6 +259,7 @@ class Snake:
         self.last_encouragement_score = 0  # 上次显示鼓励语的分数
         self.boosted = False  # 是否处于加速状态
         self.boost_start_time = 0  # 加速开始时间
+        self.moves = 0  # 已移动的步数，日志中的时间轴
         
     def get_head_position(self):
         return self.positions[0]
@@ -98,8 +268,7 @@ class Snake:
         current_time = time.time()
         
         # 计算实际速度
-        base_speeds = [0.5 * BASE_FPS, 0.75 * BASE_FPS, BASE_FPS, 1.5 * BASE_FPS, 2 * BASE_FPS]
-        current_speed = base_speeds[self.speed_level]
+        current_speed = BASE_SPEEDS[self.speed_level]
         
         # 如果处于加速状态，速度翻倍
         if self.boosted:
@@ -115,8 +284,8 @@ class Snake:
         new_y = head[1] + y
         new_position = (new_x, new_y)
         
-        # 检查是否撞墙
-        if new_x < 0 or new_x >= GRID_WIDTH or new_y < 0 or new_y >= GRID_HEIGHT:
+        # 检查是否撞墙（碰撞位图四周有一圈墙，出界同样算撞墙）
+        if self.level.is_blocked(new_x, new_y):
             return True
             
         # 检查是否撞到自己
@@ -124,6 +293,7 @@ class Snake:
             return True
             
         self.positions.insert(0, new_position)
+        self.moves += 1
         
         if len(self.positions) > self.grow_to:
             self.positions.pop()
@@ -166,7 +336,7 @@ class Snake:
         if self.boosted and time.time() - self.boost_start_time > 0.5:
             self.boosted = False
             
-    def draw(self, surface):
+    def draw(self, surface, detailed=True):
         for i, p in enumerate(self.positions):
             # 蛇头用不同颜色
             color = YELLOW if i == 0 else GREEN
@@ -179,6 +349,9 @@ class Snake:
                 
             rect = pygame.Rect((p[0] * GRID_SIZE, p[1] * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
             pygame.draw.rect(surface, color, rect)
+            # 低画质下只画色块，省去每节的描边和蛇眼睛
+            if not detailed:
+                continue
             pygame.draw.rect(surface, DARK_GREEN, rect, 1)
             
             # 绘制蛇眼睛
@@ -206,19 +379,22 @@ class Food:
         self.position = (0, 0)
         self.is_golden = is_golden
         self.spawn_time = 0
+        self.spawn_tick = 0  # 出现时蛇已移动的步数
         self.randomize_position()
         
     def randomize_position(self):
         self.position = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
         self.spawn_time = time.time()
         
-    def draw(self, surface):
+    def draw(self, surface, detailed=True):
         color = GOLD if self.is_golden else RED
         border_color = (200, 170, 0) if self.is_golden else (200, 0, 0)
         
         rect = pygame.Rect((self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
         pygame.draw.rect(surface, color, rect)
         pygame.draw.rect(surface, border_color, rect, 1)
+        if not detailed:
+            return
         
         # 绘制苹果的茎和叶
         stem_rect = pygame.Rect((self.position[0] * GRID_SIZE + GRID_SIZE // 2 - 1, 
@@ -240,17 +416,429 @@ class Food:
                                     (GRID_SIZE + 4, GRID_SIZE + 4))
             pygame.draw.rect(surface, (255, 255, 200), flash_rect, 2, border_radius=3)
 
-class Game:
+class HamiltonianSolver:
+    """沿哈密顿回路行走的自动驾驶，蛇较短时抄安全的近路去吃食物"""
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        # cycle[i] 为回路上第 i 个格子的编号，order[格子编号] 为它在回路上的序号
+        self.cycle, self.order = self.load_cycle()
+
+    def build_cycle(self):
+        """构造回路：先走完第一行，再蛇形扫过其余格子，最后沿第一列返回"""
+        w, h = self.width, self.height
+        # 行数为奇数时转置棋盘，保证蛇形扫描能回到起点
+        transposed = h % 2 == 1
+        if transposed:
+            w, h = h, w
+        if h % 2 == 1 or w < 2:
+            raise ValueError(f"{self.width}x{self.height} 的棋盘不存在哈密顿回路")
+
+        cells = [(x, 0) for x in range(w)]
+        for y in range(1, h):
+            xs = range(w - 1, 0, -1) if y % 2 == 1 else range(1, w)
+            cells.extend((x, y) for x in xs)
+        cells.extend((0, y) for y in range(h - 1, 0, -1))
+
+        typecode = 'H' if self.size <= 0xFFFF else 'I'
+        cycle = array(typecode, [0]) * self.size
+        order = array(typecode, [0]) * self.size
+        for i, (x, y) in enumerate(cells):
+            if transposed:
+                x, y = y, x
+            index = y * self.width + x
+            cycle[i] = index
+            order[index] = i
+        return cycle, order
+
+    def load_cycle(self):
+        """从磁盘缓存读取回路和顺序表，没有缓存时计算一次并写入
+
+        缓存文件开头一行记录棋盘尺寸、数组类型和内容的 SHA-1，读取时只做整块的
+        长度和摘要校验（C 速度），不必逐格检查；尺寸不符或内容损坏时重新计算。
+        """
+        typecode = 'H' if self.size <= 0xFFFF else 'I'
+        path = os.path.join(CACHE_DIR, f'hamilton_{self.width}x{self.height}.bin')
+        header = f'hamilton-v1 {self.width} {self.height} {typecode}'.encode()
+        try:
+            with open(path, 'rb') as f:
+                prefix, _, digest = f.readline().rstrip(b'\n').rpartition(b' ')
+                payload = f.read()
+            data = array(typecode)
+            if (prefix == header and len(payload) == 2 * self.size * data.itemsize and
+                    hashlib.sha1(payload).hexdigest().encode() == digest):
+                data.frombytes(payload)
+                return data[:self.size], data[self.size:]
+        except OSError:
+            pass
+
+        cycle, order = self.build_cycle()
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            payload = cycle.tobytes() + order.tobytes()
+            # 先写临时文件再替换，避免留下写了一半的缓存
+            with open(path + '.tmp', 'wb') as f:
+                f.write(header + b' ' + hashlib.sha1(payload).hexdigest().encode() + b'\n')
+                f.write(payload)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
+        return cycle, order
+
+    def distance(self, a, b):
+        """沿回路从格子 a 走到格子 b 的步数"""
+        return (self.order[b[1] * self.width + b[0]] - self.order[a[1] * self.width + a[0]]) % self.size
+
+    def next_direction(self, head, tail, length, pending, target):
+        """计算下一步方向，只查询几次顺序表，每次决策 O(1)
+
+        蛇身始终位于回路上从蛇尾到蛇头的一段之内，因此只要落点在蛇头与蛇尾之间的
+        空白段上，就一定不会撞到自己。pending 为还没长出来的节数。
+        """
+        n = self.size
+        # 只有一节时蛇尾就是蛇头，前方整圈都是空的
+        tail_dist = self.distance(head, tail) if length > 1 else n
+
+        # 允许跳过的最大步数，留出增长和缓冲空间
+        allowed = tail_dist - pending - 3
+        empty = n - length - pending - 1
+        if empty < n // 2:
+            # 蛇已经很长，老老实实沿回路走
+            allowed = 0
+        elif target is not None:
+            food_dist = self.distance(head, target)
+            if food_dist < tail_dist:
+                allowed -= 1
+                if (tail_dist - food_dist) * 4 > empty:
+                    allowed -= 10
+            allowed = min(allowed, food_dist)
+
+        best_direction = None
+        best_dist = 0
+        for direction in (UP, DOWN, LEFT, RIGHT):
+            x, y = head[0] + direction[0], head[1] + direction[1]
+            if x < 0 or x >= self.width or y < 0 or y >= self.height:
+                continue
+            dist = self.distance(head, (x, y))
+            if 0 < dist < tail_dist and dist <= allowed and dist > best_dist:
+                best_direction = direction
+                best_dist = dist
+        if best_direction:
+            return best_direction
+
+        # 没有合适的近路，走回路上的下一格
+        index = self.cycle[(self.order[head[1] * self.width + head[0]] + 1) % n]
+        return (index % self.width - head[0], index // self.width - head[1])
+
+    def choose(self, engine):
+        """为 FastEngine 选择方向"""
+        body = engine.body
+        target = engine.golden if engine.golden is not None else engine.food
+        return self.next_direction(body[0], body[-1], len(body), engine.grow_to - len(body), target)
+
+class GreedyBot:
+    """贪心自动驾驶：朝最近的食物走，只避开下一步就会撞上的格子
+
+    空地图上按曼哈顿距离走；有墙的地图上按绕开墙的 BFS 距离走，否则会在墙后面来回打转。
+    距离场按食物位置缓存，食物不动时每步仍是 O(1)。
+    """
     def __init__(self):
+        self.level = None
+        self.fields = {}  # 食物位置 -> 到该位置的 BFS 距离场
+
+    def distance(self, level, position, target):
+        if not level.wall_count:
+            return abs(position[0] - target[0]) + abs(position[1] - target[1])
+        if level is not self.level:
+            self.level = level
+            self.fields = {}
+        field = self.fields.get(target)
+        if field is None:
+            field = self.fields[target] = level.bfs(target)
+        return field[position[1] * level.width + position[0]]
+
+    def choose(self, engine):
+        head = engine.body[0]
+        target = engine.golden if engine.golden is not None else engine.food
+        best_direction = engine.direction
+        best_dist = None
+        for direction in (UP, DOWN, LEFT, RIGHT):
+            x, y = head[0] + direction[0], head[1] + direction[1]
+            if engine.level.is_blocked(x, y) or engine.occupied[y * engine.width + x]:
+                continue
+            dist = self.distance(engine.level, (x, y), target) if target else 0
+            if best_dist is None or dist < best_dist:
+                best_direction = direction
+                best_dist = dist
+        return best_direction
+
+class FastEngine:
+    """无界面的快速规则引擎，按步推进，规则与 Snake/Food/Game 完全一致
+
+    蛇身用双端队列保存，格子占用用 bytearray 记录，每一步都是 O(1)。
+    随机数的消耗顺序与原版逐一对应，同一种子下两者的结果应当相同。
+    paced 为 False 时每步都移动一格；为 True 时每步只代表 Game.run() 的一帧，
+    按速度档位和加速状态决定这一帧是否移动，供模糊测试与原版逐帧比对。
+    """
+    def __init__(self, seed=None, level=None, tick=1.0 / BASE_FPS, golden_duration=5, track_dirty=False,
+                 paced=False):
+        self.level = level or Level()
+        self.width = self.level.width
+        self.height = self.level.height
+        self.rng = random.Random(seed)
+        self.tick = tick
+        self.paced = paced
+        self.golden_ticks = golden_duration / tick  # 金苹果存活的步数
+        # 记录每步可能变化的格子，供增量绘制使用；不需要时为None，不增加开销
+        self.dirty = [] if track_dirty else None
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        start = self.level.start
+        self.body = deque([start])
+        self.occupied = bytearray(self.width * self.height)
+        self.occupied[start[1] * self.width + start[0]] = 1
+        self.direction = self.rng.choice(self.level.start_directions())
+        self.score = 0
+        self.grow_to = 3
+        self.last_encouragement_score = 0
+        self.golden = None
+        self.food = self.place()
+        self.golden_spawn_tick = 0
+        self.golden_spawn_score = 100
+        self.golden_active = False
+        self.game_over = False
+        self.game_won = False
+        self.ticks = 0
+        self.now = 0.0  # 虚拟时间，计算方式与 VirtualClock 相同
+        self.speed_level = 2
+        self.boosted = False
+        self.boost_start_time = 0.0
+        self.last_move_time = 0.0
+
+    def random_position(self):
+        return (self.rng.randint(0, self.width - 1), self.rng.randint(0, self.height - 1))
+
+    def place(self, avoid=None):
+        """随机选一个不在蛇身上的格子，棋盘已满时判定通关并返回None"""
+        if self.level.open_cells - len(self.body) - (1 if avoid else 0) <= 0:
+            self.game_won = True
+            self.game_over = True
+            return None
+        position = self.random_position()
+        while (self.occupied[position[1] * self.width + position[0]] or position == avoid or
+               not self.level.is_open(position)):
+            position = self.random_position()
+        return position
+
+    def change_direction(self, direction):
+        # 防止直接反向移动
+        if (direction[0] * -1, direction[1] * -1) == self.direction:
+            return
+        self.direction = direction
+
+    def apply(self, action):
+        """执行一个动作：转向、调速或加速，对应原版的按键处理"""
+        if action == 'faster':
+            self.speed_level = min(self.speed_level + 1, 4)
+        elif action == 'slower':
+            self.speed_level = max(self.speed_level - 1, 0)
+        elif action == 'boost':
+            self.boosted = True
+            self.boost_start_time = self.now
+        elif action == 'release':
+            self.boosted = False
+        elif action:
+            self.change_direction(action)
+
+    def move_due(self):
+        """对应 Snake.update 开头的计时：距上次移动的时间够了才移动"""
+        current_speed = BASE_SPEEDS[self.speed_level]
+        if self.boosted:
+            current_speed *= 2
+        if self.now - self.last_move_time < 1.0 / current_speed:
+            return False
+        self.last_move_time = self.now
+        return True
+
+    def grow(self, points):
+        self.grow_to += 1
+        self.score += points
+        # 对应 Game.check_encouragement，鼓励语同样要消耗一次随机数
+        if self.score >= self.last_encouragement_score + 100:
+            self.last_encouragement_score = self.score
+            self.rng.choice(ENCOURAGEMENTS)
+
+    def step(self, action=None):
+        """推进一步，action 为方向或 ACTIONS 中的调速、加速动作，返回游戏是否结束"""
+        if self.dirty is None:
+            return self.advance(action)
+        head, tail, food, golden = self.body[0], self.body[-1], self.food, self.golden
+        game_over = self.advance(action)
+        self.dirty.extend((head, tail, food, golden, self.body[0], self.food, self.golden))
+        return game_over
+
+    def advance(self, action):
+        self.ticks += 1
+        self.now += self.tick
+        self.apply(action)
+        # 对应 Snake.update_boost
+        if self.boosted and self.now - self.boost_start_time > 0.5:
+            self.boosted = False
+
+        # 生成金苹果，Food(is_golden=True) 构造时会先随机一次位置
+        if self.golden is None and self.score >= self.golden_spawn_score:
+            self.random_position()
+            position = self.place()
+            if position is not None:
+                self.golden = position
+                self.golden_spawn_tick = self.ticks
+                self.food = None
+                self.golden_spawn_score += 100
+                self.golden_active = True
+
+        # 金苹果过期后重新生成普通食物
+        if self.golden is not None and self.ticks - self.golden_spawn_tick > self.golden_ticks:
+            self.golden = None
+            self.golden_active = False
+            self.food = self.place()
+
+        if self.game_over:
+            return True
+
+        # 这一帧不移动时原版照样检查吃食物，这里也不能提前返回
+        head = self.body[0]
+        if not self.paced or self.move_due():
+            x, y = head[0] + self.direction[0], head[1] + self.direction[1]
+            if self.level.is_blocked(x, y) or self.occupied[y * self.width + x]:
+                self.game_over = True
+            else:
+                head = (x, y)
+                self.body.appendleft(head)
+                self.occupied[y * self.width + x] = 1
+                if len(self.body) > self.grow_to:
+                    tail = self.body.pop()
+                    self.occupied[tail[1] * self.width + tail[0]] = 0
+
+        if self.food is not None and head == self.food:
+            self.grow(10)
+            self.food = self.place(self.golden)
+
+        if self.golden is not None and head == self.golden:
+            self.grow(30)
+            self.golden = None
+            self.golden_active = False
+            self.food = self.place()
+
+        return self.game_over
+
+    def cell_kind(self, position):
+        """格子当前的内容，对应观战视图图集里的序号"""
+        if position == self.body[0]:
+            return CELL_HEAD
+        if self.occupied[position[1] * self.width + position[0]]:
+            return CELL_BODY
+        if position == self.golden:
+            return CELL_GOLDEN
+        if position == self.food:
+            return CELL_FOOD
+        return CELL_EMPTY
+
+    def snapshot(self):
+        """用于和原版比对的完整状态"""
+        return {
+            'score': self.score,
+            'body': list(self.body),
+            'food': self.food,
+            'golden_food': self.golden,
+            'golden_active': self.golden_active,
+            'speed_level': self.speed_level,
+            'boosted': self.boosted,
+            'game_over': self.game_over,
+            'game_won': self.game_won
+        }
+
+# 可用于模糊测试比对的优化引擎
+ENGINES = {
+    'fast': FastEngine,
+}
+
+class FrameGovernor:
+    """帧时间调节器：每帧耗时超出预算时逐级关闭特效，有富余时再逐级恢复
+
+    帧耗时取滑动平均；降级要连续超预算若干帧，恢复则要远低于预算并持续更久，
+    每次调整后先等平均值稳定下来。刚恢复就又降级时，下次恢复的等待时间加倍，
+    避免画质来回跳动。
+    """
+    def __init__(self, budget=FRAME_BUDGET, max_tier=len(QUALITY_NAMES) - 1):
+        self.budget = budget
+        self.max_tier = max_tier
+        self.tier = 0
+        self.average = 0.0  # 帧耗时的指数滑动平均(秒)
+        self.over_frames = 0  # 连续超预算的帧数
+        self.under_frames = 0  # 连续有富余的帧数
+        self.settle = 0  # 调整后还需等待的帧数
+        self.restore_delay = 120  # 恢复一档前需要连续富余的帧数
+        self.since_restore = None  # 上次恢复后经过的帧数
+
+    def record(self, frame_time):
+        """记录一帧的耗时(不含 clock.tick 的等待)，必要时调整档位"""
+        self.average += (frame_time - self.average) * 0.1
+        if self.since_restore is not None:
+            self.since_restore += 1
+        if self.settle > 0:
+            self.settle -= 1
+            return
+
+        if self.average > self.budget:
+            self.over_frames += 1
+            self.under_frames = 0
+        elif self.average < self.budget * 0.5:
+            self.under_frames += 1
+            self.over_frames = 0
+        else:
+            self.over_frames = 0
+            self.under_frames = 0
+
+        if self.over_frames >= 10 and self.tier < self.max_tier:
+            # 恢复后很快又撑不住，说明富余只是暂时的，下次多等一会儿
+            if self.since_restore is not None and self.since_restore < 600:
+                self.restore_delay = min(self.restore_delay * 2, 3600)
+            self.tier += 1
+            self.since_restore = None
+            self.changed()
+        elif self.under_frames >= self.restore_delay and self.tier > 0:
+            self.tier -= 1
+            self.since_restore = 0
+            self.changed()
+
+    def changed(self):
+        self.over_frames = 0
+        self.under_frames = 0
+        self.settle = 30
+
+    def name(self):
+        return QUALITY_NAMES[self.tier]
+
+class Game:
+    def __init__(self, level=None, log_dir=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("贪吃蛇小游戏")
         self.clock = pygame.time.Clock()
+        self.governor = FrameGovernor()  # 按帧耗时自动调整画质
         self.font = pygame.font.SysFont('microsoftyahei', 20)
         self.medium_font = pygame.font.SysFont('microsoftyahei', 25)
         self.big_font = pygame.font.SysFont('microsoftyahei', 30)
         self.encourage_font = pygame.font.SysFont('microsoftyahei', 40, bold=True)
         self.title_font = pygame.font.SysFont('microsoftyahei', 60, bold=True)
-        self.snake = Snake()
+        self.level = level or Level()  # 玩家选择的地图
+        self.demo_level = Level()  # 自动演示只在空地图上进行
+        self.wall_level = None  # 已绘制到 wall_surface 上的地图
+        self.wall_surface = None
+        self.snake = Snake(self.level)
         self.food = Food()  # 普通食物
         self.golden_food = None  # 金色食物
         self.golden_food_duration = 5  # 金苹果持续时间(秒)
@@ -262,6 +850,8 @@ class Game:
         
         # 游戏状态
         self.game_over = False
+        self.game_won = False  # 蛇占满整个棋盘
+        self.game_over_time = 0  # 演示模式下记录结束时间，用于自动重开
         self.paused = False
         self.game_started = False
         self.show_help = False
@@ -271,6 +861,7 @@ class Game:
         self.start_button = Button(SCREEN_WIDTH//2 - 100, 250, 200, 50, "开始游戏", "start")
         self.help_button = Button(SCREEN_WIDTH//2 - 100, 320, 200, 50, "按键说明", "help")
         self.rules_button = Button(SCREEN_WIDTH//2 - 100, 390, 200, 50, "游戏规则", "rules")
+        self.demo_button = Button(SCREEN_WIDTH//2 - 100, 460, 200, 50, "自动演示", "demo")
         self.back_button = Button(SCREEN_WIDTH//2 - 100, 500, 200, 50, "返回主菜单", "back")
         
         # 金苹果生成相关
@@ -280,6 +871,14 @@ class Game:
         # 保存游戏状态
         self.saved_state = None
         
+        # 对局事件日志，log_dir 为空时不记录
+        self.log_dir = log_dir
+        self.log_file = None
+        
+        # 自动演示（哈密顿回路自动驾驶）
+        self.hamiltonian = None  # 首次进入演示时才加载回路
+        self.autopilot = None
+        
         # 键盘状态跟踪
         self.key_states = {
             pygame.K_UP: {'pressed': False, 'press_time': 0},
@@ -289,11 +888,29 @@ class Game:
         }
         
     def draw_grid(self):
+        if self.governor.tier >= QUALITY_NO_GRID:
+            return
         for x in range(0, GAME_WIDTH, GRID_SIZE):
             pygame.draw.line(self.screen, GRAY, (x, 0), (x, GAME_HEIGHT), 1)
         for y in range(0, GAME_HEIGHT, GRID_SIZE):
             pygame.draw.line(self.screen, GRAY, (0, y), (GAME_WIDTH, y), 1)
             
+    def draw_walls(self):
+        level = self.snake.level
+        if not level.wall_count:
+            return
+        # 墙体只在换地图时画一次，之后直接贴图
+        if self.wall_level is not level:
+            self.wall_surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT), pygame.SRCALPHA)
+            for y in range(level.height):
+                for x in range(level.width):
+                    if level.is_blocked(x, y):
+                        rect = pygame.Rect((x * GRID_SIZE, y * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
+                        pygame.draw.rect(self.wall_surface, WALL_COLOR, rect)
+                        pygame.draw.rect(self.wall_surface, WALL_BORDER, rect, 1)
+            self.wall_level = level
+        self.screen.blit(self.wall_surface, (0, 0))
+            
     def draw_score_panel(self):
         # 绘制右侧面板背景
         panel_rect = pygame.Rect(GAME_WIDTH, 0, SCREEN_WIDTH - GAME_WIDTH, SCREEN_HEIGHT)
@@ -302,6 +919,8 @@ class Game:
         # 绘制标题
         title_text = self.big_font.render("游戏状态", True, LIGHT_BLUE)
         self.screen.blit(title_text, (GAME_WIDTH + 40, 20))
+        quality_text = self.font.render(f'画质: {self.governor.name()}', True, GREEN if self.governor.tier == 0 else ORANGE)
+        self.screen.blit(quality_text, (GAME_WIDTH + 180, 28))
         
         # 绘制分数信息
         score_text = self.medium_font.render(f'得分: {self.snake.score}', True, WHITE)
@@ -350,7 +969,10 @@ class Game:
         overlay.fill(BLACK)
         self.screen.blit(overlay, (0, 0))
         
-        game_over_text = self.big_font.render('游戏结束!', True, RED)
+        if self.game_won:
+            game_over_text = self.big_font.render('恭喜通关!', True, GOLD)
+        else:
+            game_over_text = self.big_font.render('游戏结束!', True, RED)
         score_text = self.medium_font.render(f'最终得分: {self.snake.score}', True, WHITE)
         restart_text = self.medium_font.render('按 R 键重新开始', True, GREEN)
         menu_text = self.medium_font.render('按 ESC 返回主菜单', True, LIGHT_BLUE)
@@ -386,11 +1008,12 @@ class Game:
             bg_rect = pygame.Rect(0, 0, text_surf.get_width() + 40, text_surf.get_height() + 20)
             bg_rect.center = (GAME_WIDTH // 2, GAME_HEIGHT // 2 - 100)
             
-            # 绘制半透明背景
-            bg_surf = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(bg_surf, (0, 0, 0, alpha//3), (0, 0, bg_rect.width, bg_rect.height), border_radius=10)
-            pygame.draw.rect(bg_surf, (255, 215, 0, alpha), (0, 0, bg_rect.width, bg_rect.height), 3, border_radius=10)
-            self.screen.blit(bg_surf, bg_rect)
+            # 绘制半透明背景（每次都要新建带透明通道的表面，画质降低时省掉）
+            if self.governor.tier < QUALITY_NO_TEXT_BG:
+                bg_surf = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
+                pygame.draw.rect(bg_surf, (0, 0, 0, alpha//3), (0, 0, bg_rect.width, bg_rect.height), border_radius=10)
+                pygame.draw.rect(bg_surf, (255, 215, 0, alpha), (0, 0, bg_rect.width, bg_rect.height), 3, border_radius=10)
+                self.screen.blit(bg_surf, bg_rect)
             
             # 绘制文字
             text_rect = text_surf.get_rect(center=bg_rect.center)
@@ -429,6 +1052,7 @@ class Game:
         self.start_button.draw(self.screen)
         self.help_button.draw(self.screen)
         self.rules_button.draw(self.screen)
+        self.demo_button.draw(self.screen)
         
         # 绘制作者信息
         author_text = self.medium_font.render("Python贪吃蛇游戏   作者：贺巍", True, PURPLE)
@@ -484,15 +1108,72 @@ class Game:
         # 绘制返回按钮
         self.back_button.draw(self.screen)
         
+    def reset_game(self):
+        """重置蛇和食物，开始新的一局"""
+        self.snake.reset()
+        self.place_food(self.food)
+        self.golden_food = None
+        self.game_over = False
+        self.game_won = False
+        self.game_over_time = 0
+        self.golden_spawn_score = 100
+        self.golden_active = False
+        self.log_event('start', level=self.snake.level.name, width=self.snake.level.width,
+                       height=self.snake.level.height, speed=self.snake.speed_level)
+        
+    def log_event(self, event, **fields):
+        """向对局日志追加一条事件（JSON 行），演示模式不记录"""
+        if not self.log_dir or self.autopilot:
+            return
+        if self.log_file is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            name = time.strftime('game-%Y%m%d-%H%M%S') + f'-{os.getpid()}.jsonl'
+            self.log_file = open(os.path.join(self.log_dir, name), 'a', encoding='utf-8', buffering=1)
+        fields['event'] = event
+        fields['tick'] = self.snake.moves
+        self.log_file.write(json.dumps(fields, ensure_ascii=False) + '\n')
+        
+    def log_game_end(self):
+        self.log_event('end', score=self.snake.score, pos=self.snake.get_head_position(),
+                       length=len(self.snake.positions), won=self.game_won)
+        
+    def start_demo(self):
+        """开始自动演示，由哈密顿回路自动驾驶"""
+        if self.hamiltonian is None:
+            self.hamiltonian = HamiltonianSolver()
+        self.autopilot = self.hamiltonian
+        self.snake.level = self.demo_level
+        self.reset_game()
+        self.snake.speed_level = 4
+        self.paused = False
+        
+    def place_food(self, food, avoid=None):
+        """把食物放到不在蛇身上、也不在墙里或封闭区域的空格里，棋盘已被占满时判定通关并返回False"""
+        level = self.snake.level
+        free = level.open_cells - len(self.snake.positions) - (1 if avoid else 0)
+        if free <= 0:
+            food.position = None
+            self.game_won = True
+            self.game_over = True
+            return False
+            
+        food.randomize_position()
+        while (food.position in self.snake.positions or (avoid and food.position == avoid) or
+               not level.is_open(food.position)):
+            food.randomize_position()
+        food.spawn_tick = self.snake.moves
+        return True
+        
     def spawn_golden_food(self):
         """在达到100分倍数时生成金色苹果"""
         if self.golden_food is None and self.snake.score >= self.golden_spawn_score:
-            self.golden_food = Food(is_golden=True)
-            self.golden_food.randomize_position()
+            golden_food = Food(is_golden=True)
             
             # 确保金苹果不在蛇身上
-            while self.golden_food.position in self.snake.positions:
-                self.golden_food.randomize_position()
+            if not self.place_food(golden_food):
+                return
+            self.golden_food = golden_food
+            self.log_event('golden_spawn', pos=golden_food.position)
                 
             # 移除普通食物
             self.food.position = None
@@ -509,11 +1190,11 @@ class Game:
             if current_time - self.golden_food.spawn_time > self.golden_food_duration:
                 self.golden_food = None
                 self.golden_active = False
+                self.log_event('golden_expire')
                 
                 # 重新生成普通食物
-                self.food.randomize_position()
-                while self.food.position in self.snake.positions:
-                    self.food.randomize_position()
+                if not self.place_food(self.food):
+                    self.log_game_end()
     
     def check_encouragement(self):
         """检查是否需要显示鼓励语"""
@@ -538,9 +1219,11 @@ class Game:
                 'grow_to': self.snake.grow_to,
                 'last_encouragement_score': self.snake.last_encouragement_score,
                 'boosted': self.snake.boosted,
-                'boost_start_time': self.snake.boost_start_time
+                'boost_start_time': self.snake.boost_start_time,
+                'moves': self.snake.moves
             },
             'food': self.food.position if self.food else None,
+            'food_spawn_tick': self.food.spawn_tick,
             'golden_food': self.golden_food.position if self.golden_food else None,
             'golden_spawn_score': self.golden_spawn_score,
             'golden_active': self.golden_active,
@@ -561,17 +1244,20 @@ class Game:
             self.snake.last_encouragement_score = state['snake']['last_encouragement_score']
             self.snake.boosted = state['snake']['boosted']
             self.snake.boost_start_time = state['snake']['boost_start_time']
+            self.snake.moves = state['snake']['moves']
             
             # 恢复食物状态
             if state['food']:
                 self.food.position = state['food']
+                self.food.spawn_tick = state['food_spawn_tick']
             else:
-                self.food.randomize_position()
+                self.place_food(self.food, state['golden_food'])
                 
             # 恢复金苹果状态
             if state['golden_food']:
                 self.golden_food = Food(is_golden=True)
                 self.golden_food.position = state['golden_food']
+                self.golden_food.spawn_tick = self.snake.moves  # 恢复后金苹果重新计时
             else:
                 self.golden_food = None
                 
@@ -582,6 +1268,45 @@ class Game:
             self.encouragement_timer = state['encouragement_timer']
             self.paused = state['paused']
     
+    def update_game(self):
+        """推进一帧游戏逻辑：移动蛇、吃食物并检查鼓励语"""
+        # 演示模式下由自动驾驶决定方向
+        if self.autopilot:
+            target = self.golden_food.position if self.golden_food else self.food.position
+            positions = self.snake.positions
+            self.snake.direction = self.autopilot.next_direction(
+                positions[0], positions[-1], len(positions),
+                self.snake.grow_to - len(positions), target)
+            
+        self.game_over = self.snake.update()
+        
+        # 检查是否吃到普通食物
+        if self.food.position is not None and self.snake.get_head_position() == self.food.position:
+            self.snake.grow()
+            self.log_event('food', kind='red', pos=self.food.position, score=self.snake.score,
+                           wait=self.snake.moves - self.food.spawn_tick)
+            self.check_encouragement()  # 检查是否需要鼓励
+            # 确保食物不出现在蛇身上
+            self.place_food(self.food, self.golden_food.position if self.golden_food else None)
+        
+        # 检查是否吃到金色食物
+        if self.golden_food and self.snake.get_head_position() == self.golden_food.position:
+            self.snake.grow(30)  # 金色苹果得30分
+            self.log_event('food', kind='golden', pos=self.golden_food.position, score=self.snake.score,
+                           wait=self.snake.moves - self.golden_food.spawn_tick)
+            self.check_encouragement()  # 检查是否需要鼓励
+            self.golden_food = None
+            self.golden_active = False
+            
+            # 生成新的普通食物
+            self.place_food(self.food)
+        
+        # 更新鼓励系统
+        self.check_encouragement()
+        
+        if self.game_over:
+            self.log_game_end()
+    
     def update_key_states(self):
         """更新按键状态并检测长按"""
         current_time = time.time()
@@ -596,6 +1321,7 @@ class Game:
         last_time = time.time()
         
         while True:
+            frame_start = time.perf_counter()
             current_time = time.time()
             dt = current_time - last_time
             last_time = current_time
@@ -608,6 +1334,7 @@ class Game:
                 self.start_button.check_hover(mouse_pos)
                 self.help_button.check_hover(mouse_pos)
                 self.rules_button.check_hover(mouse_pos)
+                self.demo_button.check_hover(mouse_pos)
             elif self.show_help:
                 # 按键说明界面
                 self.back_button.check_hover(mouse_pos)
@@ -617,13 +1344,21 @@ class Game:
                 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    if self.log_file:
+                        self.log_file.close()
                     pygame.quit()
                     sys.exit()
                 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         if self.game_started:
-                            if self.game_over:
+                            if self.autopilot:
+                                # 演示模式直接返回主菜单，不覆盖玩家的存档
+                                self.autopilot = None
+                                self.game_started = False
+                                self.game_over = False
+                                self.paused = False
+                            elif self.game_over:
                                 # 游戏结束状态返回主菜单
                                 self.game_started = False
                                 self.game_over = False
@@ -648,8 +1383,8 @@ class Game:
                             self.key_states[event.key]['pressed'] = True
                             self.key_states[event.key]['press_time'] = time.time()
                             
-                        # 处理方向键按下 - 立即改变方向（仅在非暂停状态）
-                        if not self.paused:
+                        # 处理方向键按下 - 立即改变方向（仅在非暂停状态，演示模式由自动驾驶控制）
+                        if not self.paused and not self.autopilot:
                             if event.key == pygame.K_UP:
                                 self.snake.change_direction(UP)
                             elif event.key == pygame.K_DOWN:
@@ -662,28 +1397,26 @@ class Game:
                         # 处理其他功能键（无论是否暂停都应响应）
                         if event.key == pygame.K_q:
                             self.snake.increase_speed()
+                            self.log_event('speed', speed=self.snake.speed_level)
                         elif event.key == pygame.K_e:
                             self.snake.decrease_speed()
+                            self.log_event('speed', speed=self.snake.speed_level)
                         elif event.key == pygame.K_p:  # 将P键处理移出方向键条件块
                             # 切换暂停状态
                             self.paused = not self.paused
                         elif event.key == pygame.K_r:
-                            self.snake.reset()
-                            self.food.randomize_position()
-                            self.golden_food = None
-                            self.game_over = False
-                            self.golden_spawn_score = 100
-                            self.golden_active = False
+                            if self.autopilot:
+                                self.start_demo()
+                            else:
+                                self.reset_game()
                     
                     
 
                     if self.game_over and event.key == pygame.K_r:
-                        self.snake.reset()
-                        self.food.randomize_position()
-                        self.golden_food = None
-                        self.game_over = False
-                        self.golden_spawn_score = 100
-                        self.golden_active = False
+                        if self.autopilot:
+                            self.start_demo()
+                        else:
+                            self.reset_game()
                 
                 if event.type == pygame.KEYUP:
                     # 处理按键释放
@@ -697,19 +1430,19 @@ class Game:
                         # 主菜单按钮
                         if self.start_button.hovered:
                             self.game_started = True
+                            self.autopilot = None
+                            self.snake.level = self.level
                             
                             # 如果有保存的状态，则恢复游戏状态
                             if self.saved_state:
                                 self.restore_game_state(self.saved_state)
                             else:
                                 # 否则初始化新游戏
-                                self.snake.reset()
-                                self.food.randomize_position()
-                                self.golden_food = None
-                                self.golden_spawn_score = 100
-                                self.golden_active = False
-                                self.game_over = False
+                                self.reset_game()
                                 self.paused = False
+                        elif self.demo_button.hovered:
+                            self.game_started = True
+                            self.start_demo()
                         elif self.help_button.hovered:
                             self.show_help = True
                         elif self.rules_button.hovered:
@@ -742,15 +1475,17 @@ class Game:
                 # 绘制游戏区域
                 self.screen.fill(BLACK, (0, 0, GAME_WIDTH, GAME_HEIGHT))
                 self.draw_grid()
-                self.snake.draw(self.screen)
+                self.draw_walls()
+                self.snake.draw(self.screen, self.governor.tier < QUALITY_NO_SNAKE_DETAIL)
                 
                 # 绘制食物（只有当前存在的食物）
+                food_detail = self.governor.tier < QUALITY_NO_FOOD_DETAIL
                 if self.food.position is not None:
-                    self.food.draw(self.screen)
+                    self.food.draw(self.screen, food_detail)
                 
                 # 绘制金色苹果（如果存在）
                 if self.golden_food:
-                    self.golden_food.draw(self.screen)
+                    self.golden_food.draw(self.screen, food_detail)
                 
                 # 绘制鼓励语
                 self.draw_encouragement()
@@ -763,38 +1498,617 @@ class Game:
                     self.draw_pause()
                 elif self.game_over:
                     self.draw_game_over()
+                    
+                    # 演示模式结束后稍等片刻自动重新开始
+                    if self.autopilot:
+                        if not self.game_over_time:
+                            self.game_over_time = current_time
+                        elif current_time - self.game_over_time > 3:
+                            self.start_demo()
                 else:
                     # 更新游戏状态
-                    self.game_over = self.snake.update()
-                    
-                    # 检查是否吃到普通食物
-                    if self.food.position is not None and self.snake.get_head_position() == self.food.position:
-                        self.snake.grow()
-                        self.check_encouragement()  # 检查是否需要鼓励
-                        self.food.randomize_position()
-                        # 确保食物不出现在蛇身上
-                        while (self.food.position in self.snake.positions or 
-                              (self.golden_food and self.food.position == self.golden_food.position)):
-                            self.food.randomize_position()
-                    
-                    # 检查是否吃到金色食物
-                    if self.golden_food and self.snake.get_head_position() == self.golden_food.position:
-                        self.snake.grow(30)  # 金色苹果得30分
-                        self.check_encouragement()  # 检查是否需要鼓励
-                        self.golden_food = None
-                        self.golden_active = False
-                        
-                        # 生成新的普通食物
-                        self.food.randomize_position()
-                        while self.food.position in self.snake.positions:
-                            self.food.randomize_position()
-                    
-                    # 更新鼓励系统
-                    self.check_encouragement()
+                    self.update_game()
             
             pygame.display.update()
+            # 只统计本帧实际干活的时间，clock.tick 的等待不算
+            self.governor.record(time.perf_counter() - frame_start)
             self.clock.tick(60)
 
+class SpectatorView:
+    """多局观战视图：在一个窗口里平铺显示多局独立的模拟，右侧显示汇总统计
+
+    模拟按固定步频推进，与画面帧率无关；每个格子图块降频刷新、错开刷新时机，
+    只重绘有变化的格子，所有图块共用一张小图集。
+    """
+    def __init__(self, count=16, rate=20, bot='mixed'):
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("贪吃蛇观战")
+        self.clock = pygame.time.Clock()
+        self.medium_font = pygame.font.SysFont('microsoftyahei', 25)
+        self.big_font = pygame.font.SysFont('microsoftyahei', 30)
+
+        self.count = count
+        self.rate = rate  # 每局每秒模拟的步数
+        self.tile_interval = 4  # 每个图块每隔几帧刷新一次
+
+        # 图块布局：每个图块都是 600x600 游戏区域的缩小版
+        self.cols = 1
+        while self.cols * self.cols < count:
+            self.cols += 1
+        self.tile_size = GAME_WIDTH // self.cols
+        self.cell = max(1, (self.tile_size - 2) // GRID_WIDTH)
+
+        # 共用图集：空格、蛇身、蛇头、红苹果、金苹果各占一格
+        self.atlas = pygame.Surface((self.cell * 5, self.cell))
+        for kind, color in enumerate((BLACK, GREEN, YELLOW, RED, GOLD)):
+            self.atlas.fill(color, (kind * self.cell, 0, self.cell, self.cell))
+
+        solver = HamiltonianSolver()
+        greedy = GreedyBot()
+        self.next_seed = 0
+        self.engines = []
+        self.bots = []
+        self.tiles = []
+        self.full_redraw = []
+        for i in range(count):
+            self.engines.append(FastEngine(seed=self.next_seed, track_dirty=True))
+            self.next_seed += 1
+            if bot == 'hamilton' or (bot == 'mixed' and i % 2 == 0):
+                self.bots.append(solver)
+            else:
+                self.bots.append(greedy)
+            self.tiles.append(pygame.Surface((self.cell * GRID_WIDTH, self.cell * GRID_HEIGHT)))
+            self.full_redraw.append(True)
+
+        # 统计数据
+        self.finished = 0
+        self.total_score = 0
+        self.best_score = 0
+        self.wins = 0
+        self.total_ticks = 0
+
+    def tile_origin(self, i):
+        """第 i 个图块在屏幕上的左上角位置（居中在分配的格子里）"""
+        offset = (self.tile_size - self.cell * GRID_WIDTH) // 2
+        return (i % self.cols * self.tile_size + offset, i // self.cols * self.tile_size + offset)
+
+    def advance(self, steps):
+        """所有对局各推进 steps 步，结束的对局记入统计后换新种子重开"""
+        for i, engine in enumerate(self.engines):
+            bot = self.bots[i]
+            for _ in range(steps):
+                if engine.step(bot.choose(engine)):
+                    self.finished += 1
+                    self.total_score += engine.score
+                    self.best_score = max(self.best_score, engine.score)
+                    self.wins += engine.game_won
+                    engine.reset(self.next_seed)
+                    self.next_seed += 1
+                    self.full_redraw[i] = True
+            self.total_ticks += steps
+
+    def draw_tile(self, i):
+        """重绘一个图块，返回需要刷新的屏幕区域"""
+        engine = self.engines[i]
+        tile = self.tiles[i]
+        cell = self.cell
+
+        # 变化的格子太多时整块重画更快
+        if self.full_redraw[i] or len(engine.dirty) > len(engine.body) + 2:
+            tile.fill(BLACK)
+            cells = list(engine.body) + [engine.food, engine.golden]
+            self.full_redraw[i] = False
+        else:
+            cells = engine.dirty
+
+        for position in cells:
+            if position is not None:
+                area = (engine.cell_kind(position) * cell, 0, cell, cell)
+                tile.blit(self.atlas, (position[0] * cell, position[1] * cell), area)
+        engine.dirty.clear()
+
+        return self.screen.blit(tile, self.tile_origin(i))
+
+    def draw_stats_panel(self, fps):
+        panel_rect = pygame.Rect(GAME_WIDTH, 0, SCREEN_WIDTH - GAME_WIDTH, SCREEN_HEIGHT)
+        pygame.draw.rect(self.screen, PANEL_BG, panel_rect)
+
+        title_text = self.big_font.render("观战统计", True, LIGHT_BLUE)
+        self.screen.blit(title_text, (GAME_WIDTH + 40, 20))
+
+        average = self.total_score / self.finished if self.finished else 0
+        longest = max(len(engine.body) for engine in self.engines)
+        stats = [
+            f"对局数: {self.count}",
+            f"模拟速度: {self.rate} 步/秒",
+            f"帧率: {fps:.0f}",
+            f"总步数: {self.total_ticks}",
+            f"已结束: {self.finished}",
+            f"平均得分: {average:.1f}",
+            f"最高得分: {self.best_score}",
+            f"通关次数: {self.wins}",
+            f"当前最长: {longest}",
+        ]
+        for i, text in enumerate(stats):
+            stat = self.medium_font.render(text, True, WHITE)
+            self.screen.blit(stat, (GAME_WIDTH + 40, 70 + i * 35))
+
+        controls = ["↑/↓: 调整模拟速度", "ESC: 退出"]
+        for i, text in enumerate(controls):
+            tip = self.medium_font.render(text, True, YELLOW)
+            self.screen.blit(tip, (GAME_WIDTH + 40, 510 + i * 35))
+        return panel_rect
+
+    def run(self):
+        self.screen.fill(DARK_BLUE)
+        pygame.display.update()
+        accumulator = 0.0
+        frame = 0
+
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    pygame.quit()
+                    return
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_UP:
+                        self.rate = min(2000, self.rate * 2)
+                    elif event.key == pygame.K_DOWN:
+                        self.rate = max(1, self.rate // 2)
+
+            # 模拟按真实经过的时间推进，与画面帧率无关；卡顿时最多补 0.25 秒
+            dt = self.clock.tick(60) / 1000.0
+            accumulator = min(accumulator + dt * self.rate, self.rate * 0.25)
+            steps = int(accumulator)
+            accumulator -= steps
+            if steps:
+                self.advance(steps)
+
+            # 每帧只刷新一部分图块，且只刷新有变化的
+            updated = []
+            for i in range(frame % self.tile_interval, self.count, self.tile_interval):
+                if self.full_redraw[i] or self.engines[i].dirty:
+                    updated.append(self.draw_tile(i))
+            if frame % 15 == 0:
+                updated.append(self.draw_stats_panel(self.clock.get_fps()))
+            pygame.display.update(updated)
+            frame += 1
+
+class VirtualClock:
+    """虚拟时钟，让依赖真实时间的原版规则可以逐步重放
+
+    作为上下文管理器使用，期间只替换 time.time，time 模块的其他函数照常可用。
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.real_time = None
+        
+    def time(self):
+        return self.now
+
+    def __enter__(self):
+        self.real_time = time.time
+        time.time = self.time
+        return self
+
+    def __exit__(self, *exc_info):
+        time.time = self.real_time
+
+def reference_snapshot(game):
+    """读取原版 Game 的状态，字段与 FastEngine.snapshot() 对应"""
+    return {
+        'score': game.snake.score,
+        'body': list(game.snake.positions),
+        'food': game.food.position,
+        'golden_food': game.golden_food.position if game.golden_food else None,
+        'golden_active': game.golden_active,
+        'speed_level': game.snake.speed_level,
+        'boosted': game.snake.boosted,
+        'game_over': game.game_over,
+        'game_won': game.game_won
+    }
+
+def misplaced_food(snapshot, level):
+    """返回不在可到达空格上的食物位置，没有则返回None"""
+    for position in (snapshot['food'], snapshot['golden_food']):
+        if position is not None and (not level.is_open(position) or position in snapshot['body']):
+            return position
+    return None
+
+def replay_trace(game, engine, seed, actions, action_rng=None, driver=None, noise=0.0):
+    """用同一种子和动作序列分别驱动原版和优化引擎，逐帧比对
+
+    action_rng 不为空时边跑边生成随机动作并写回 actions。再给出 driver(自动驾驶)时
+    方向交给它决定，这样才能玩出长蛇、金苹果和通关；noise 为插入随机干扰动作的概率，
+    为 0 时只在不需要转向的帧里随机调速或加速，不会害死蛇。
+    两边共有的错误比对不出来，所以每帧还检查食物是否落在可到达的空格上。
+    返回 (已执行帧数, 分歧信息或None)。
+    """
+    with VirtualClock() as clock:
+        random.seed(seed)
+        game.reset_game()
+        game.autopilot = None
+        engine.reset(seed)
+        
+        position = misplaced_food(reference_snapshot(game), game.snake.level)
+        if position is not None:
+            return 0, {'tick': -1, 'expected': reference_snapshot(game), 'actual': engine.snapshot(),
+                       'reason': f'食物 {position} 不在可到达的空格上'}
+        
+        for tick in range(len(actions)):
+            if action_rng and driver:
+                # 两边状态逐帧相同，用引擎的状态替自动驾驶做决定即可
+                direction = driver.choose(engine)
+                if action_rng.random() < noise:
+                    actions[tick] = action_rng.randint(1, len(ACTIONS) - 1)
+                elif direction == engine.direction and action_rng.random() < 0.02:
+                    actions[tick] = action_rng.choice((5, 5, 6, 7, 7, 7, 8))
+                else:
+                    actions[tick] = ACTIONS.index(direction)
+            elif action_rng:
+                actions[tick] = 0 if action_rng.random() < 0.85 else action_rng.randint(1, len(ACTIONS) - 1)
+            action = ACTIONS[actions[tick]]
+            
+            # 原版：与 Game.run() 中一帧的顺序相同
+            clock.now += FUZZ_TICK
+            if action == 'faster':
+                game.snake.increase_speed()
+            elif action == 'slower':
+                game.snake.decrease_speed()
+            elif action == 'boost':
+                game.snake.start_boost()
+            elif action == 'release':
+                game.snake.stop_boost()
+            elif action:
+                game.snake.change_direction(action)
+            game.snake.update_boost()
+            game.spawn_golden_food()
+            game.update_golden_food()
+            if not game.game_over:
+                game.update_game()
+                
+            engine.step(action)
+            
+            expected = reference_snapshot(game)
+            actual = engine.snapshot()
+            if expected != actual:
+                return tick + 1, {'tick': tick, 'expected': expected, 'actual': actual}
+            position = misplaced_food(expected, game.snake.level)
+            if position is not None:
+                return tick + 1, {'tick': tick, 'expected': expected, 'actual': actual,
+                                  'reason': f'食物 {position} 不在可到达的空格上'}
+            if game.game_over:
+                return tick + 1, None
+        return len(actions), None
+
+def shrink_trace(game, engine, seed, actions, budget):
+    """删减动作序列，得到仍然能复现分歧的最短回放，最多花费 budget 秒"""
+    deadline = time.time() + budget
+    
+    def diverges(candidate):
+        return replay_trace(game, engine, seed, candidate)[1]
+        
+    failure = diverges(actions)
+    actions = actions[:failure['tick'] + 1]
+    
+    # 先成段删除动作，段长逐次减半
+    chunk = max(1, len(actions) // 2)
+    while chunk >= 1 and time.time() < deadline:
+        i = 0
+        while i < len(actions) and time.time() < deadline:
+            candidate = actions[:i] + actions[i + chunk:]
+            if candidate and diverges(candidate):
+                actions = candidate
+            else:
+                i += chunk
+        chunk //= 2
+        
+    # 再把剩下的动作尽量换成“不操作”
+    for i in range(len(actions)):
+        if time.time() >= deadline:
+            break
+        if actions[i]:
+            candidate = actions[:i] + [0] + actions[i + 1:]
+            if diverges(candidate):
+                actions = candidate
+                
+    failure = diverges(actions)
+    return actions[:failure['tick'] + 1], failure
+
+def fuzz_batch(task):
+    """工作进程：跑一批种子，返回 (总帧数, 通关局数, 第一个分歧的最简回放或None)"""
+    engine_name, level_path, first_seed, count, max_ticks, shrink_time = task
+    level = Level.load(level_path) if level_path else Level()
+    game = Game(level)
+    engine = ENGINES[engine_name](level=level, tick=FUZZ_TICK, golden_duration=game.golden_food_duration,
+                                  paced=True)
+    # 哈密顿回路会穿过墙，有墙的地图改用贪心自动驾驶
+    driver = GreedyBot() if level.wall_count else HamiltonianSolver()
+    total = 0
+    wins = 0
+    
+    for seed in range(first_seed, first_seed + count):
+        # 按种子轮换三种玩法：纯随机操作；自动驾驶加少量干扰，覆盖长蛇和金苹果；
+        # 每 20 个种子有一个不加干扰的自动驾驶，一直玩到结束，覆盖占满棋盘通关
+        actions = [0] * max_ticks
+        action_rng = random.Random(f'actions-{seed}')
+        mode = seed % 20
+        if mode < 8:
+            ticks, failure = replay_trace(game, engine, seed, actions, action_rng)
+        elif mode < 19:
+            ticks, failure = replay_trace(game, engine, seed, actions, action_rng, driver, 0.01)
+        else:
+            ticks, failure = replay_trace(game, engine, seed, actions, action_rng, driver)
+        total += ticks
+        wins += game.game_won
+        if failure:
+            actions, failure = shrink_trace(game, engine, seed, actions[:ticks], shrink_time)
+            return total, wins, {'engine': engine_name, 'level': level_path, 'seed': seed,
+                                 'actions': actions, 'failure': failure}
+    return total, wins, None
+
+def run_fuzz(args):
+    """差分模糊测试：多进程比对原版规则和优化引擎，发现分歧返回1"""
+    if args.replay:
+        with open(args.replay, encoding='utf-8') as f:
+            record = json.load(f)
+        level = Level.load(record['level']) if record.get('level') else Level()
+        engine = ENGINES[record['engine']](level=level, tick=FUZZ_TICK, paced=True)
+        ticks, failure = replay_trace(Game(level), engine, record['seed'], record['actions'])
+        if failure is None:
+            print(f"回放 {ticks} 帧，未出现分歧")
+            return 0
+        print(f"第 {failure['tick']} 帧出现分歧")
+        if failure.get('reason'):
+            print(failure['reason'])
+        print(f"原版: {failure['expected']}")
+        print(f"引擎: {failure['actual']}")
+        return 1
+        
+    level_path = args.fuzz_level or args.level
+    print(f"比对地图: {level_path or '空地图'}")
+    workers = args.workers or os.cpu_count() or 1
+    batch_size = 20
+    next_seed = args.seed
+    total = 0
+    wins = 0
+    start_time = time.time()
+    
+    with multiprocessing.Pool(workers) as pool:
+        while total < args.ticks:
+            tasks = []
+            for _ in range(workers * 2):
+                tasks.append((args.engine, level_path, next_seed, batch_size, args.max_trace, args.shrink_time))
+                next_seed += batch_size
+            for ticks, batch_wins, record in pool.imap_unordered(fuzz_batch, tasks):
+                total += ticks
+                wins += batch_wins
+                if record:
+                    path = f"fuzz-{record['engine']}-{record['seed']}.json"
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(record, f, ensure_ascii=False)
+                    print(f"种子 {record['seed']} 出现分歧，最简回放 {len(record['actions'])} 帧，已保存到 {path}")
+                    if record['failure'].get('reason'):
+                        print(record['failure']['reason'])
+                    pool.terminate()
+                    return 1
+            print(f"已比对 {total} 帧，种子 {args.seed}-{next_seed - 1}，其中 {wins} 局占满棋盘通关，"
+                  f"用时 {time.time() - start_time:.1f} 秒")
+            
+    print(f"全部通过：{args.engine} 引擎与原版规则在 {total} 帧内完全一致")
+    return 0
+
+def iter_log_events(path):
+    """逐行读取一个日志文件，跳过损坏的行（例如游戏被强制关闭时写了一半的行）"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def iter_games(events):
+    """把事件流切分成一局一局，内存里每次只保留一局的事件"""
+    game = None
+    for event in events:
+        if event.get('event') == 'start':
+            if game:
+                yield game
+            game = [event]
+        elif game is not None:
+            game.append(event)
+            if event.get('event') == 'end':
+                yield game
+                game = None
+    if game:
+        yield game
+
+def new_accumulators():
+    """分析结果的累加器，大小固定，与日志数量无关"""
+    import numpy as np
+    return {
+        'death_heatmap': np.zeros((GRID_HEIGHT, GRID_WIDTH), np.int64),
+        'food_heatmap': np.zeros((GRID_HEIGHT, GRID_WIDTH), np.int64),
+        'wait_red': np.zeros(WAIT_BINS, np.int64),  # 红苹果从出现到被吃掉的步数
+        'wait_golden': np.zeros(WAIT_BINS, np.int64),
+        'golden': np.zeros(3, np.int64),  # 金苹果出现、吃到、过期的次数
+        'speed_ticks': np.zeros(5, np.int64),  # 各速度档位下移动的步数
+        'final_scores': np.zeros(SCORE_BINS, np.int64),
+        'curve_sum': np.zeros(CURVE_POINTS, np.float64),  # 每个采样点上的得分之和
+        'curve_count': np.zeros(CURVE_POINTS, np.int64),  # 每个采样点上仍在进行的局数
+        'games': np.zeros(3, np.int64),  # 总局数、正常结束的局数、通关局数
+    }
+
+def accumulate_game(acc, events):
+    """把一局的事件累加进 acc"""
+    import numpy as np
+    speed = events[0].get('speed', 2)
+    last_tick = 0
+    food_ticks = [0]
+    food_scores = [0]
+
+    for event in events[1:]:
+        kind = event['event']
+        if kind == 'food':
+            golden = event['kind'] == 'golden'
+            acc['wait_golden' if golden else 'wait_red'][min(event['wait'], WAIT_BINS - 1)] += 1
+            acc['golden'][1] += golden
+            x, y = event['pos']
+            if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+                acc['food_heatmap'][y, x] += 1
+            food_ticks.append(event['tick'])
+            food_scores.append(event['score'])
+        elif kind == 'golden_spawn':
+            acc['golden'][0] += 1
+        elif kind == 'golden_expire':
+            acc['golden'][2] += 1
+        elif kind == 'speed':
+            acc['speed_ticks'][speed] += event['tick'] - last_tick
+            last_tick = event['tick']
+            speed = event['speed']
+
+    final_tick = events[-1]['tick']
+    acc['speed_ticks'][speed] += final_tick - last_tick
+    acc['games'][0] += 1
+
+    end = events[-1] if events[-1]['event'] == 'end' else None
+    if end is None:
+        return
+    acc['games'][1] += 1
+    acc['games'][2] += bool(end['won'])
+    x, y = end['pos']
+    if not end['won'] and 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+        acc['death_heatmap'][y, x] += 1
+    acc['final_scores'][min(end['score'] // 10, SCORE_BINS - 1)] += 1
+
+    # 得分曲线：每隔 CURVE_STEP 步取一次当时的得分
+    samples = np.arange(min(final_tick // CURVE_STEP + 1, CURVE_POINTS)) * CURVE_STEP
+    indices = np.searchsorted(food_ticks, samples, side='right') - 1
+    acc['curve_sum'][:len(samples)] += np.asarray(food_scores)[indices]
+    acc['curve_count'][:len(samples)] += 1
+
+def analyze_log_files(paths):
+    """工作进程：流式分析一批日志文件，返回合并后的累加器"""
+    acc = new_accumulators()
+    for path in paths:
+        for events in iter_games(iter_log_events(path)):
+            accumulate_game(acc, events)
+    return acc
+
+def render_heatmap(counts, path):
+    """按游戏区域的网格尺寸把计数画成热力图 PNG，越热越亮（黑→红→黄）"""
+    import numpy as np
+    surface = pygame.Surface((GAME_WIDTH, GAME_HEIGHT))
+    surface.fill(BLACK)
+    peak = counts.max()
+    for y, x in zip(*np.nonzero(counts)):
+        heat = counts[y, x] / peak
+        color = (int(255 * min(1.0, 2 * heat)), int(255 * max(0.0, 2 * heat - 1)), 0)
+        surface.fill(color, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+    for x in range(0, GAME_WIDTH, GRID_SIZE):
+        pygame.draw.line(surface, GRAY, (x, 0), (x, GAME_HEIGHT), 1)
+    for y in range(0, GAME_HEIGHT, GRID_SIZE):
+        pygame.draw.line(surface, GRAY, (0, y), (GAME_WIDTH, y), 1)
+    pygame.image.save(surface, path)
+
+def histogram_median(bins):
+    """直方图的中位数所在的桶"""
+    import numpy as np
+    total = bins.sum()
+    return int(np.searchsorted(np.cumsum(bins), (total + 1) // 2)) if total else 0
+
+def run_analytics(args):
+    """多进程流式分析对局日志，输出汇总数组和热力图"""
+    try:
+        import numpy as np
+    except ImportError:
+        print("日志分析需要 NumPy，请先运行 pip install numpy")
+        return 1
+
+    paths = []
+    for path in args.paths or [LOG_DIR]:
+        if os.path.isdir(path):
+            paths.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.jsonl')))
+        elif os.path.isfile(path):
+            paths.append(path)
+        elif args.paths:
+            print(f"找不到 {path}，已跳过")
+    if not paths:
+        print("没有找到对局日志")
+        return 1
+
+    # 文件平均分给各进程；每批至少 4 个文件，减少进程间传递累加器的次数，
+    # 文件很多时每批最多 64 个，让先做完的进程接着领新的一批
+    workers = args.workers or os.cpu_count() or 1
+    size = min(64, max(4, -(-len(paths) // workers)))
+    batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+    total = new_accumulators()
+    with multiprocessing.Pool(min(workers, len(batches))) as pool:
+        for acc in pool.imap_unordered(analyze_log_files, batches):
+            for key in total:
+                total[key] += acc[key]
+
+    os.makedirs(args.out, exist_ok=True)
+    np.savez(os.path.join(args.out, 'summary.npz'), **total)
+    render_heatmap(total['death_heatmap'], os.path.join(args.out, 'death_heatmap.png'))
+    render_heatmap(total['food_heatmap'], os.path.join(args.out, 'food_heatmap.png'))
+
+    games, finished, wins = total['games']
+    scores = total['final_scores']
+    average = (scores * (np.arange(SCORE_BINS) * 10 + 5)).sum() / finished if finished else 0
+    spawned, captured, expired = total['golden']
+    speed_total = total['speed_ticks'].sum()
+    print(f"日志文件: {len(paths)}，对局: {games}，正常结束: {finished}，通关: {wins}")
+    print(f"平均得分: 约 {average:.0f}")
+    print(f"吃到红苹果所需步数中位数: {histogram_median(total['wait_red'])}")
+    print(f"金苹果: 出现 {spawned}，吃到 {captured}，过期 {expired}，"
+          f"捕获率 {captured / spawned if spawned else 0:.1%}")
+    usage = "，".join(f"{name} {ticks / speed_total if speed_total else 0:.1%}"
+                     for name, ticks in zip(["0.5x", "0.75x", "1x", "1.5x", "2x"], total['speed_ticks']))
+    print(f"速度档位使用: {usage}")
+    print(f"结果已保存到 {args.out}（summary.npz、death_heatmap.png、food_heatmap.png）")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="贪吃蛇小游戏")
+    parser.add_argument('--level', metavar='FILE', help="加载地图文件（'#' 为墙，'S' 为出生点）")
+    parser.add_argument('--no-log', action='store_true', help="不记录对局日志")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    fuzz_parser = subparsers.add_parser('fuzz', help="差分模糊测试：比对优化引擎与原版规则")
+    fuzz_parser.add_argument('--engine', choices=sorted(ENGINES), default='fast', help="要验证的引擎")
+    fuzz_parser.add_argument('--ticks', type=int, default=2000000, help="总共比对的帧数")
+    fuzz_parser.add_argument('--seed', type=int, default=0, help="起始种子")
+    fuzz_parser.add_argument('--max-trace', type=int, default=1000000, help="单局最多帧数，默认足够自动驾驶占满棋盘")
+    fuzz_parser.add_argument('--shrink-time', type=float, default=60, help="缩减分歧回放最多花费的秒数")
+    fuzz_parser.add_argument('--workers', type=int, default=0, help="进程数，默认使用全部核心")
+    # 单独的 dest，避免子命令的默认值覆盖写在子命令前面的全局 --level
+    fuzz_parser.add_argument('--level', dest='fuzz_level', metavar='FILE', help="在指定地图上比对，同全局 --level")
+    fuzz_parser.add_argument('--replay', metavar='FILE', help="重放保存的分歧回放")
+    
+    spectate_parser = subparsers.add_parser('spectate', help="观战模式：一个窗口同时显示多局自动对局")
+    spectate_parser.add_argument('--games', type=int, choices=range(16, 65), default=16, metavar='16-64',
+                                 help="同时显示的对局数")
+    spectate_parser.add_argument('--rate', type=int, default=20, help="每局每秒模拟的步数")
+    spectate_parser.add_argument('--bot', choices=['mixed', 'hamilton', 'greedy'], default='mixed',
+                                 help="自动驾驶：mixed 为哈密顿回路与贪心交替")
+    
+    analytics_parser = subparsers.add_parser('analytics', help="分析对局日志，输出热力图和统计数组")
+    analytics_parser.add_argument('paths', nargs='*', help="日志文件或目录，默认为 logs/")
+    analytics_parser.add_argument('--out', default='analytics', help="输出目录")
+    analytics_parser.add_argument('--workers', type=int, default=0, help="进程数，默认使用全部核心")
+    
+    args = parser.parse_args()
+    if args.command == 'analytics':
+        sys.exit(run_analytics(args))
+    if args.command == 'fuzz':
+        sys.exit(run_fuzz(args))
+    if args.command == 'spectate':
+        SpectatorView(args.games, args.rate, args.bot).run()
+        return
+        
+    game = Game(Level.load(args.level) if args.level else None, None if args.no_log else LOG_DIR)
+    game.run()
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    main()